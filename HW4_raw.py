@@ -1,7 +1,8 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import datetime
+from StockBot_MetricCache import cached_metric
+from StockBot_Snapshot import get_ticker, start_recording, save_snapshot
 
 QUARTERS_WINDOW = 5*4  # 最近5年 = 20季
 TARGET_HORIZON_Q = 1  # 下一季回報
@@ -18,7 +19,7 @@ def ensure_datetime_index(s: pd.Series) -> pd.Series:
     return s
 
 def fetch_price_quarterly(symbol: str, years_back: int = 6) -> pd.Series:
-    ticker_hist = yf.Ticker(symbol)
+    ticker_hist = get_ticker(symbol)
     start_date = datetime.datetime.now() - datetime.timedelta(days=years_back*365)
     hist = ticker_hist.history(start=start_date)
     if hist.empty:
@@ -30,7 +31,7 @@ def fetch_price_quarterly(symbol: str, years_back: int = 6) -> pd.Series:
 
 def build_quarterly_dataset(symbol: str, save_csv: bool = True) -> pd.DataFrame:
     symbol = normalize_symbol(symbol)
-    ticker = yf.Ticker(symbol)
+    ticker = get_ticker(symbol)
 
     # 財報抓取
     try:
@@ -97,10 +98,10 @@ def build_quarterly_dataset(symbol: str, save_csv: bool = True) -> pd.DataFrame:
     df['eps_q_pct'] = df['eps_q'].pct_change(fill_method=None)
     df['revenue_q_pct'] = df['revenue_q'].pct_change(fill_method=None)
     df['net_income_q_pct'] = df['net_income_q'].pct_change(fill_method=None)
-    df['net_margin_q'] = df['net_income_q'] / df['revenue_q']
-    df['roe_q'] = (df['net_income_q']*4) / df['equity_q']
-    df['ic_q'] = df['ebit_q'] / df['interest_exp_q']
-    df['fcf_q'] = df['op_cf_q'] + df['capex_q']
+    df['net_margin_q'] = cached_metric("net_margin", net_income=df['net_income_q'], revenue=df['revenue_q'])
+    df['roe_q'] = cached_metric("roe", net_income=df['net_income_q']*4, equity=df['equity_q'])  # 年化
+    df['ic_q'] = cached_metric("interest_coverage", ebit=df['ebit_q'], interest=df['interest_exp_q'])
+    df['fcf_q'] = cached_metric("fcf", op_cf=df['op_cf_q'], capex=df['capex_q'])
 
     # target: next quarter return
     df['next_q_price'] = df['price_q'].shift(-TARGET_HORIZON_Q)
@@ -116,17 +117,22 @@ def build_quarterly_dataset(symbol: str, save_csv: bool = True) -> pd.DataFrame:
     return df
 
 # ======= 批次處理 =======
-symbols = ["VZ", "JNJ", "PFE", "AMGN", "T", "XOM", "CVX", "MO", "KO", "VICI", "PEP", "AAPL"]
-datasets = {}
-for s in symbols:
-    try:
-        df = build_quarterly_dataset(s)
-        datasets[s] = df
-    except Exception as e:
-        print(f"{s} 發生錯誤: {e}")
-
-# 示範印出最後 5 列
-for sym, df in datasets.items():
-    print("="*60)
-    print(sym)
-    print(df.tail(5)[['price_q','next_q_price','next_q_return','target_up']])
+if __name__ == "__main__":
+    symbols = ["VZ", "JNJ", "PFE", "AMGN", "T", "XOM", "CVX", "MO", "KO", "VICI", "PEP", "AAPL"]
+    start_recording()  # 記錄這次用到的季報與股價資料，之後可以 replay
+    datasets = {}
+    for s in symbols:
+        try:
+            df = build_quarterly_dataset(s)
+            datasets[s] = df
+        except Exception as e:
+            print(f"{s} 發生錯誤: {e}")
+
+    save_snapshot(f"HW4_{'_'.join(symbols)}", __file__,
+                  outputs=[f"ML_Quarterly_Dataset_{s}.csv" for s in datasets])
+
+    # 示範印出最後 5 列
+    for sym, df in datasets.items():
+        print("="*60)
+        print(sym)
+        print(df.tail(5)[['price_q','next_q_price','next_q_return','target_up']])
@@ -0,0 +1,216 @@
+import asyncio
+import csv
+import math
+import os
+import random
+import tempfile
+import time
+from array import array
+
+from StockBot_HW3_FairPrice import FAIR_PRICE_COLUMN, score_stock, normalize_symbol
+
+# 每個 symbol 目前相對合理價格的位置
+STATE_UNKNOWN = 0
+STATE_BELOW = 1  # 現價 < 合理價格 (HW3 的 "Current < Fair?" = Y)
+STATE_ABOVE = 2  # 現價 >= 合理價格
+
+
+# =================== 合理價格 (事先算好，放進 array) ===================
+def load_fair_prices(summary_csv: str):
+    """從 HW3 的 Report_Summary_*.csv 讀取合理價格，回傳 (symbols, fair_prices)"""
+    symbols = []
+    fair_prices = array("d")
+    with open(summary_csv, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        col = header.index(FAIR_PRICE_COLUMN)
+        for row in reader:
+            if not row or not row[0]:
+                continue
+            try:
+                fair = float(row[col])
+            except ValueError:
+                fair = math.nan  # 算不出 fair price (ex: 沒有股息)
+            symbols.append(row[0])
+            fair_prices.append(fair)
+    return symbols, fair_prices
+
+
+def compute_fair_prices(stock_symbol: list):
+    """直接呼叫 HW3 的 score_stock 計算合理價格 (需要網路)"""
+    symbols = []
+    fair_prices = array("d")
+    for symbol in stock_symbol:
+        symbol = normalize_symbol(symbol.strip())
+        score_df, raw_df, Total_Score = score_stock(symbol)
+        if score_df is None:
+            continue
+        symbols.append(symbol)
+        fair_prices.append(float(score_df[FAIR_PRICE_COLUMN].iloc[0]))
+    return symbols, fair_prices
+
+
+# =================== 監控器 ===================
+class FairPriceMonitor:
+    """
+    持有整個 universe 的合理價格 (array)，每個 tick 只做:
+    dict 查 index -> 比較價格 -> 狀態改變時產生 crossing event。 O(1)
+    """
+
+    def __init__(self, symbols: list, fair_prices):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.fair_prices = array("d", fair_prices)
+        self.last_prices = array("d", [math.nan]) * len(self.symbols)
+        self.states = bytearray(len(self.symbols))  # 全部從 STATE_UNKNOWN 開始
+        self.tick_count = 0
+        self.event_count = 0
+
+    def on_tick(self, symbol: str, price: float):
+        """處理一筆報價；發生穿越時回傳 (symbol, 方向, 現價, 合理價格)，否則回傳 None"""
+        self.tick_count += 1
+        i = self.index.get(symbol)
+        if i is None:
+            return None  # 不在 universe 內的報價直接略過
+        self.last_prices[i] = price
+        fair = self.fair_prices[i]
+        if fair != fair:  # NaN: 沒有合理價格
+            return None
+
+        new_state = STATE_BELOW if price < fair else STATE_ABOVE
+        old_state = self.states[i]
+        if new_state == old_state:
+            return None
+        self.states[i] = new_state
+        if old_state == STATE_UNKNOWN:
+            return None  # 第一筆報價只建立初始狀態，不算穿越
+
+        self.event_count += 1
+        direction = "below" if new_state == STATE_BELOW else "above"
+        return symbol, direction, price, fair
+
+    def undervalued(self) -> list:
+        """目前現價 < 合理價格的公司清單 (即時版的 "Current < Fair?" = Y)"""
+        return [s for s, state in zip(self.symbols, self.states) if state == STATE_BELOW]
+
+
+# =================== 報價來源 (可替換) ===================
+# 報價來源 = 任何 async iterator，每次產生 (symbol, price)
+
+def parse_quote_line(line: str):
+    symbol, price = line.split(",", 1)
+    return symbol.strip(), float(price)
+
+
+async def replay_file_quotes(path: str, batch_lines: int = 4096):
+    """重播本地檔案 (每行 "SYMBOL,price")，測試用"""
+    with open(path, encoding="utf-8") as f:
+        while True:
+            lines = f.readlines(batch_lines * 16)  # 一次讀一批，避免每行一次 I/O
+            if not lines:
+                break
+            for line in lines:
+                if line.strip():
+                    yield parse_quote_line(line)
+            await asyncio.sleep(0)  # 讓出控制權給其他 task
+
+
+async def socket_quotes(host: str, port: int):
+    """從 TCP socket 讀取報價 (每行 "SYMBOL,price")，可接真的行情源或本地測試 server"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.decode("utf-8").strip()
+            if line:
+                yield parse_quote_line(line)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def print_event(event):
+    symbol, direction, price, fair = event
+    if direction == "below":
+        print(f"[買點] {symbol} 跌破合理價格: 現價 {price:.2f} < {fair:.2f}")
+    else:
+        print(f"[離開] {symbol} 回到合理價格之上: 現價 {price:.2f} >= {fair:.2f}")
+
+
+async def run_monitor(monitor: FairPriceMonitor, quotes, on_event=print_event) -> int:
+    """消費報價串流直到結束，回傳處理的 tick 數"""
+    on_tick = monitor.on_tick
+    n = 0
+    async for symbol, price in quotes:
+        n += 1
+        event = on_tick(symbol, price)
+        if event is not None and on_event is not None:
+            on_event(event)
+    return n
+
+
+# =================== Benchmark ===================
+def write_random_walk_quotes(path: str, symbols: list, fair_prices, n_ticks: int, seed: int = 0):
+    """產生在合理價格附近隨機游走的報價檔，讓穿越事件真的會發生"""
+    rng = random.Random(seed)
+    prices = [fair if fair == fair else 100.0 for fair in fair_prices]
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(n_ticks):
+            i = rng.randrange(len(symbols))
+            prices[i] *= 1 + rng.gauss(0, 0.01)
+            f.write(f"{symbols[i]},{prices[i]:.4f}\n")
+
+
+def benchmark(n_ticks: int = 500_000, n_symbols: int = 3000):
+    rng = random.Random(42)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    fair_prices = array("d", (rng.uniform(10, 300) for _ in range(n_symbols)))
+    monitor = FairPriceMonitor(symbols, fair_prices)
+
+    fd, path = tempfile.mkstemp(suffix=".quotes")
+    os.close(fd)
+    try:
+        write_random_walk_quotes(path, symbols, fair_prices, n_ticks)
+        start = time.perf_counter()
+        n = asyncio.run(run_monitor(monitor, replay_file_quotes(path), on_event=None))
+        elapsed = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    print("-" * 50)
+    print(f"ticks: {n}, symbols: {n_symbols}, crossing events: {monitor.event_count}")
+    print(f"耗時 {elapsed:.3f}s, 吞吐量 {n / elapsed:,.0f} ticks/s")
+    print("-" * 50)
+    return n / elapsed
+
+
+# =================== 主程式 ===================
+if __name__ == "__main__":
+    source = input("Please input quote source (replay 檔案路徑 / host:port / bench): ").strip()
+
+    if source == "bench":
+        benchmark()
+    else:
+        fair_source = input("Please input HW3 Report_Summary csv 或 stock Symbol(用逗號 ',' 分隔): ").strip()
+        if os.path.exists(fair_source):
+            symbols, fair_prices = load_fair_prices(fair_source)
+        else:
+            symbols, fair_prices = compute_fair_prices(fair_source.upper().split(","))
+        monitor = FairPriceMonitor(symbols, fair_prices)
+
+        if os.path.exists(source):
+            quotes = replay_file_quotes(source)
+        else:
+            host, port = source.rsplit(":", 1)
+            quotes = socket_quotes(host, int(port))
+
+        try:
+            n = asyncio.run(run_monitor(monitor, quotes))
+        except KeyboardInterrupt:
+            n = monitor.tick_count
+        print("-" * 50)
+        print(f"共處理 {n} 筆報價, {monitor.event_count} 次穿越")
+        print(f"目前是合理價格公司:{monitor.undervalued()}")
+        print("-" * 50)
@@ -5,6 +5,7 @@ import numpy as np
 from PIL.ImageMath import lambda_eval
 from matplotlib.lines import lineStyles
 from matplotlib.pyplot import figure
+from StockBot_MetricCache import cached_metric
 
 #General
 AAPL = yf.Ticker("AAPL")
@@ -35,24 +36,24 @@ annual_dividens = annual_dividen.loc[2015:2025] # 2015~2025 dividen
 #Free Cashflow, 10yrs are positive
 AAPL_op_cf = AAPL_cf.loc["Operating Cash Flow"]
 AAPL_capitalEx = AAPL_cf.loc["Capital Expenditure"]
-AAPL_FCF = AAPL_op_cf + AAPL_capitalEx
+AAPL_FCF = cached_metric("fcf", op_cf=AAPL_op_cf, capex=AAPL_capitalEx)
 #Free Cashflow
 
 #ROE, >15%
 AAPL_equity = AAPL_bs.loc["Stockholders Equity"]
-AAPL_ROE = AAPL_net_income / AAPL_equity *100
+AAPL_ROE = cached_metric("roe", net_income=AAPL_net_income, equity=AAPL_equity) *100
 #ROE
 
 #Interest coverage, >10, at least >4
 AAPL_EBIT = AAPL_fin.loc["EBIT"]
 AAPL_InterEX = AAPL_fin.loc["Interest Expense"]
-AAPL_InterCover = AAPL_EBIT/AAPL_InterEX
+AAPL_InterCover = cached_metric("interest_coverage", ebit=AAPL_EBIT, interest=AAPL_InterEX)
 #Interest coverage
 
 
 #Net Margin, >20%, or >10% and keep growing up
 
-net_margin = (AAPL_net_income / AAPL_revenue) *100
+net_margin = cached_metric("net_margin", net_income=AAPL_net_income, revenue=AAPL_revenue) *100
 #Net Margin
 
 '''
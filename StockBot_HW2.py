@@ -1,11 +1,12 @@
-import yfinance as yf
 import pandas as pd
+from StockBot_MetricCache import cached_metric
+from StockBot_Snapshot import get_ticker, start_recording, save_snapshot
 from numpy.matlib import empty
 from pandas.core.indexes.multi import names_compat
 
 
 def score_stock(symbol: str):
-    ticker = yf.Ticker(symbol)
+    ticker = get_ticker(symbol)
 
     # 財報資料
     try:
@@ -57,7 +58,7 @@ def score_stock(symbol: str):
         equity_sub = equity[equity.index.year.isin(years)]
         net_sub.index = net_sub.index.year
         equity_sub.index = equity_sub.index.year
-        roe = net_sub / equity_sub
+        roe = cached_metric("roe", net_income=net_sub, equity=equity_sub)
         score["ROE: 每年都>20%"] = 1 if all(roe > 0.2) else 0
     except Exception:
         roe = pd.Series(dtype=float)
@@ -71,7 +72,7 @@ def score_stock(symbol: str):
         net_sub = net_sub[net_sub.index.year.isin(years)]
         revenue_sub.index = revenue_sub.index.year
         net_sub.index = net_sub.index.year
-        nm = net_sub / revenue_sub
+        nm = cached_metric("net_margin", net_income=net_sub, revenue=revenue_sub)
         if all(nm > 0.2):
             score["Net Margin: 每年>20%(+1), 每年>10%(+0.5)"] = 1
         elif all(nm > 0.1):
@@ -88,7 +89,7 @@ def score_stock(symbol: str):
         interest = fin.loc["Interest Expense"].abs()
         ebit_sub = ebit[ebit.index.year.isin(years)]
         interest_sub = interest[interest.index.year.isin(years)]
-        ic = (ebit_sub / interest_sub).dropna()
+        ic = cached_metric("interest_coverage", ebit=ebit_sub, interest=interest_sub).dropna()
         ic.index = ic.index.year
         if all(ic > 10):
             score["IC: >10% (+1), >4 (+0.5)"] = 1
@@ -108,7 +109,7 @@ def score_stock(symbol: str):
         cap_sub = capex[capex.index.year.isin(years)]
         # op_sub.index = op_sub.index.year
         # cap_sub.index = cap_sub.index.year
-        fcf = op_sub + cap_sub
+        fcf = cached_metric("fcf", op_cf=op_sub, capex=cap_sub)
         fcf.index = fcf.index.year
         score["FCF: 每年>0"] = 1 if all(fcf > 0) else 0
     except Exception:
@@ -139,6 +140,7 @@ def score_stock(symbol: str):
 # =================== 主程式 ===================
 if __name__ == "__main__":
     stock_symbol = input("Please input stock Symbol(用逗號 ',' 分隔): ").strip().upper().split(",")
+    start_recording()  # 記錄這次用到的財報資料，之後可以 replay
 
     all_scores = []
     all_raws = []
@@ -167,3 +169,7 @@ if __name__ == "__main__":
     final_scores.to_csv(f"Report_{stock_symbol}_score.csv")
     final_raws.to_csv(f"Report_{stock_symbol}_raw.csv")
 
+    file_symbol_name = "_".join([s.strip() for s in stock_symbol if s.strip()])
+    save_snapshot(f"HW2_{file_symbol_name}", __file__,
+                  outputs=[f"Report_{stock_symbol}_score.csv", f"Report_{stock_symbol}_raw.csv"])
+
@@ -1,12 +1,14 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+from StockBot_MetricCache import cached_metric
+from StockBot_Snapshot import get_ticker, start_recording, save_snapshot
 
 # 預設參數 (目標股息率)
 TARGET_DIVIDEND_YIELD = 0.05
+FAIR_PRICE_COLUMN = "Fair Price(yield 5%))"  # Report_Summary 的合理價格欄位
 
 def score_stock(symbol: str):
-    ticker = yf.Ticker(symbol)
+    ticker = get_ticker(symbol)
 
     # 嘗試抓取 info，如果失敗則直接return None*3 (score_df, raw_df, Total_Score)
     try:
@@ -87,7 +89,7 @@ def score_stock(symbol: str):
         equity_sub = equity[equity.index.year.isin(years)]
         net_sub.index = net_sub.index.year
         equity_sub.index = equity_sub.index.year
-        roe = net_sub / equity_sub
+        roe = cached_metric("roe", net_income=net_sub, equity=equity_sub)
         score["ROE: 每年都>20%"] = 1 if all(roe > 0.2) else 0
     except Exception:
         roe = pd.Series(dtype=float)
@@ -101,7 +103,7 @@ def score_stock(symbol: str):
         net_sub = net_sub[net_sub.index.year.isin(years)]
         revenue_sub.index = revenue_sub.index.year
         net_sub.index = net_sub.index.year
-        nm = net_sub / revenue_sub
+        nm = cached_metric("net_margin", net_income=net_sub, revenue=revenue_sub)
         if all(nm > 0.2):
             score["Net Margin: 每年>20%(+1), 每年>10%(+0.5)"] = 1
         elif all(nm > 0.1):
@@ -118,7 +120,7 @@ def score_stock(symbol: str):
         interest = fin.loc["Interest Expense"].abs()
         ebit_sub = ebit[ebit.index.year.isin(years)]
         interest_sub = interest[interest.index.year.isin(years)]
-        ic = (ebit_sub / interest_sub).dropna()
+        ic = cached_metric("interest_coverage", ebit=ebit_sub, interest=interest_sub).dropna()
         ic.index = ic.index.year
         if all(ic > 10):
             score["IC: >10% (+1), >4 (+0.5)"] = 1
@@ -136,7 +138,7 @@ def score_stock(symbol: str):
         capex = cf.loc["Capital Expenditure"]
         op_sub = op_cf[op_cf.index.year.isin(years)]
         cap_sub = capex[capex.index.year.isin(years)]
-        fcf = op_sub + cap_sub
+        fcf = cached_metric("fcf", op_cf=op_sub, capex=cap_sub)
         fcf.index = fcf.index.year
         score["FCF: 每年>0"] = 1 if all(fcf > 0) else 0
     except Exception:
@@ -194,7 +196,7 @@ def score_stock(symbol: str):
     score["EPS avg Growth Rate"] = f"{eps_avg_rate:.2%}"  # 顯示為百分比
     score["Latest yearly dividen"] = latest_dividen
     score["Estimated dividen"] = expected_dividen
-    score["Fair Price(yield 5%))"] = fair_price
+    score[FAIR_PRICE_COLUMN] = fair_price
     score["Current Price"] = current_price
     score["Current < Fair?"] = is_buy
 
@@ -222,6 +224,7 @@ def normalize_symbol(symbol:str) -> str:
 # =================== 主程式 ===================
 if __name__ == "__main__":
     stock_symbol = input("Please input stock Symbol(用逗號 ',' 分隔): ").strip().upper().split(",")
+    start_recording()  # 記錄這次用到的財報與股價資料，之後可以 replay
 
     all_scores = []
     all_raws = []
@@ -279,6 +282,9 @@ if __name__ == "__main__":
         print(f"評分與估值結果已儲存至: Report_Summary_{file_symbol_name}.csv")
         print(f"原始數據已儲存至: Report_RawData_{file_symbol_name}.csv")
 
+        save_snapshot(f"HW3_{file_symbol_name}", __file__,
+                      outputs=[f"Report_Summary_{file_symbol_name}.csv", f"Report_RawData_{file_symbol_name}.csv"])
+
     else:
         print("沒有取得任何股票資料")
 
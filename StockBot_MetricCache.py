@@ -0,0 +1,254 @@
+import atexit
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+
+# 共用快取位置 (HW1/HW2/HW3/HW4_raw 都讀寫同一個檔案)
+CACHE_PATH = os.environ.get("STOCKBOT_METRIC_CACHE", os.path.join(".metric_cache", "metrics.sqlite"))
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # 超過 64MB 就依 LRU 淘汰
+
+
+# =================== 指標定義 ===================
+# 改公式時把 version +1；函數原始碼也會一起算進版本，忘記改版本號也不會讀到舊結果
+
+def roe(net_income: pd.Series, equity: pd.Series) -> pd.Series:
+    return net_income / equity
+
+def net_margin(net_income: pd.Series, revenue: pd.Series) -> pd.Series:
+    return net_income / revenue
+
+def interest_coverage(ebit: pd.Series, interest: pd.Series) -> pd.Series:
+    return ebit / interest
+
+def free_cash_flow(op_cf: pd.Series, capex: pd.Series) -> pd.Series:
+    return op_cf + capex  # capex 在 yfinance 裡是負數
+
+METRICS = {
+    "roe": (1, roe),
+    "net_margin": (1, net_margin),
+    "interest_coverage": (1, interest_coverage),
+    "fcf": (1, free_cash_flow),
+}
+
+
+def metric_version(name: str) -> str:
+    version, func = METRICS[name]
+    source_hash = hashlib.sha256(inspect.getsource(func).encode("utf-8")).hexdigest()[:12]
+    return f"{version}:{source_hash}"
+
+# 版本在 import 時算一次就好，不要每次查詢都重新讀原始碼
+METRIC_VERSIONS = {name: metric_version(name) for name in METRICS}
+
+
+def hash_inputs(inputs: dict) -> str:
+    """用輸入財報片段 (index + 數值) 算出內容 hash"""
+    h = hashlib.sha256()
+    for arg_name in sorted(inputs):
+        s = inputs[arg_name]
+        h.update(arg_name.encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(s, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def compute_metric(name: str, **inputs) -> pd.Series:
+    """不經過快取，直接計算"""
+    return METRICS[name][1](**inputs)
+
+
+# =================== 磁碟快取 (sqlite, LRU) ===================
+class MetricCache:
+    FLUSH_EVERY = 256  # 累積多少次命中才把 last_access / 統計寫回 sqlite
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        # 本次執行的統計 (還沒寫回 sqlite 的部分放在 _pending_*)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pending_access = {}  # {key: last_access}
+        self._pending_counts = {"hits": 0, "misses": 0, "evictions": 0}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            " key TEXT PRIMARY KEY, metric TEXT, version TEXT,"
+            " size INTEGER, last_access REAL, value BLOB)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON metrics(last_access)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+        self.conn.commit()
+        self.invalidate_stale()
+        atexit.register(self._flush_at_exit)
+
+    def get_or_compute(self, name: str, **inputs) -> pd.Series:
+        """快取讀寫出錯時直接計算；指標公式本身的錯誤照常往外丟"""
+        try:
+            key = hashlib.sha256(f"{name}|{METRIC_VERSIONS[name]}|{hash_inputs(inputs)}".encode("utf-8")).hexdigest()
+            result = self._load(key)
+        except Exception as e:
+            self._report_error(e)
+            return compute_metric(name, **inputs)
+        if result is not None:
+            return result
+
+        result = compute_metric(name, **inputs)
+        try:
+            self._store(key, name, result)
+        except Exception as e:
+            self._report_error(e)
+        return result
+
+    def _load(self, key: str):
+        row = self.conn.execute("SELECT value FROM metrics WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            try:
+                result = pickle.loads(row[0])
+            except Exception:
+                result = None  # 壞掉的快取當作沒命中，重算後覆蓋
+            if result is not None:
+                self._count("hits")
+                self._pending_access[key] = time.time()
+                if len(self._pending_access) >= self.FLUSH_EVERY:
+                    self.flush()
+                return result
+        self._count("misses")
+        return None
+
+    def _store(self, key: str, name: str, result: pd.Series):
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?)",
+            (key, name, METRIC_VERSIONS[name], len(blob), time.time(), blob),
+        )
+        self.flush()  # 寫入時順便把累積的 last_access 與統計寫回，再做 LRU 淘汰
+
+    def _report_error(self, e: Exception):
+        print(f"指標快取錯誤，改為直接計算: {e}")
+        try:
+            self.conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _count(self, name: str, n: int = 1):
+        setattr(self, name, getattr(self, name) + n)
+        self._pending_counts[name] += n
+
+    def flush(self):
+        """把累積的 last_access、統計寫回 sqlite，並做 LRU 淘汰"""
+        if self._pending_access:
+            self.conn.executemany(
+                "UPDATE metrics SET last_access = ? WHERE key = ?",
+                [(t, key) for key, t in self._pending_access.items()],
+            )
+            self._pending_access = {}
+        self._evict()
+        for name, n in self._pending_counts.items():
+            if n:
+                self.conn.execute(
+                    "INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                    (name, n, n),
+                )
+        self._pending_counts = dict.fromkeys(self._pending_counts, 0)
+        self.conn.commit()
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"指標快取統計寫回失敗: {e}")
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM metrics").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 從最久沒用的開始刪，直到回到上限以內
+        for key, size in self.conn.execute("SELECT key, size FROM metrics ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM metrics WHERE key = ?", (key,))
+            total -= size
+            self._count("evictions")
+
+    def invalidate_stale(self) -> int:
+        """刪除公式已經改變 (版本不同) 的快取"""
+        removed = 0
+        for name, version in METRIC_VERSIONS.items():
+            cur = self.conn.execute("DELETE FROM metrics WHERE metric = ? AND version != ?", (name, version))
+            removed += cur.rowcount
+        cur = self.conn.execute(
+            f"DELETE FROM metrics WHERE metric NOT IN ({','.join('?' * len(METRICS))})", tuple(METRICS)
+        )
+        removed += cur.rowcount
+        self.conn.commit()
+        return removed
+
+    def invalidate(self, name: str = None) -> int:
+        """手動清除某個指標 (或全部) 的快取"""
+        if name is None:
+            cur = self.conn.execute("DELETE FROM metrics")
+        else:
+            cur = self.conn.execute("DELETE FROM metrics WHERE metric = ?", (name,))
+        self.conn.commit()
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        """所有 script 累積的統計 (存在 sqlite 裡)，另外附上本次執行的命中數"""
+        self.flush()
+        totals = dict(self.conn.execute("SELECT name, value FROM stats").fetchall())
+        entries, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM metrics").fetchone()
+        hits, misses = totals.get("hits", 0), totals.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": totals.get("evictions", 0),
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_default_cache = None
+_cache_disabled = False
+
+def get_cache() -> MetricCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MetricCache()
+    return _default_cache
+
+
+def cached_metric(name: str, **inputs) -> pd.Series:
+    """
+    ex: cached_metric("roe", net_income=net_sub, equity=equity_sub)
+    快取本身出錯 (sqlite 被鎖、檔案壞掉...) 時直接計算，不要讓評分變成 0 分
+    """
+    global _cache_disabled
+    if not _cache_disabled:
+        try:
+            cache = get_cache()
+        except (sqlite3.Error, OSError) as e:
+            print(f"指標快取無法開啟，改為直接計算: {e}")
+            _cache_disabled = True
+        else:
+            return cache.get_or_compute(name, **inputs)
+    return compute_metric(name, **inputs)
+
+
+# =================== 主程式 ===================
+if __name__ == "__main__":
+    cache = get_cache()
+    print("-" * 50)
+    for k, v in cache.stats().items():
+        print(f"{k}: {v}")
+    print("-" * 50)
@@ -0,0 +1,179 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from StockBot_HW3_FairPrice import TARGET_DIVIDEND_YIELD, FAIR_PRICE_COLUMN
+
+N_SIMULATIONS = 10_000
+PERCENTILES = [5, 25, 50, 75, 95]
+MEMORY_BUDGET_MB = 256  # 每個 chunk 的暫存陣列上限
+
+EPS_GROWTH_CAP = 0.15  # 跟 HW3 一樣，成長率上限 15%
+MIN_GROWTH_STD = 0.02  # 只有兩三年資料時，標準差不要小到沒有意義
+YIELD_FLOOR = 0.01  # 避免除以接近 0 的股息率
+# 股息率的波動: 目標股息率 x 股息成長率標準差 (股息每年晃 10%，同股價下的股息率也晃 10%)
+DEFAULT_YIELD_STD = 0.01  # 股息資料不足兩年時使用
+YIELD_STD_RANGE = (0.0025, 0.02)
+# 折現率 (安全邊際) 的波動: EPS 成長率越不穩定，安全邊際越不確定
+DISCOUNT_STD_PER_EPS_STD = 0.1  # EPS 成長率標準差 20% -> 折現率 ± 2%
+DISCOUNT_STD_RANGE = (0.005, 0.04)
+
+
+# =================== 輸入資料 (從 HW3 報表讀取) ===================
+def base_discount_rate(total_score: np.ndarray) -> np.ndarray:
+    """跟 HW3 7.1 相同: >=5分 8%, >=3分 10%, 其他 12%"""
+    return np.select([total_score >= 5, total_score >= 3], [0.08, 0.10], default=0.12)
+
+
+def load_inputs(summary_csv: str, raw_csv: str) -> pd.DataFrame:
+    """
+    每個 symbol 一列:
+    latest_dividen, eps_growth_mean, eps_growth_std (由 EPS 歷史擬合),
+    yield_std (由股息歷史擬合), discount_rate, discount_std, current_price
+    """
+    summary = pd.read_csv(summary_csv, index_col=0)
+    raw = pd.read_csv(raw_csv, index_col=0)
+    raw = raw.dropna(subset=["Symbol"])  # 去掉公司之間的空白行
+    raw.index = raw.index.astype(int)
+    raw = raw.rename_axis("Year").reset_index().sort_values(["Symbol", "Year"])
+
+    # EPS 成長率 (整個 universe 一次 groupby 算完)
+    raw["eps_growth"] = raw.groupby("Symbol")["EPS 原始資料"].pct_change(fill_method=None)
+    growth = raw.groupby("Symbol")["eps_growth"].agg(["mean", "std"])
+
+    # 股息成長率的波動
+    raw["div_growth"] = raw.groupby("Symbol")["Dividen 原始資料"].pct_change(fill_method=None)
+    div_growth_std = raw.groupby("Symbol")["div_growth"].std()
+
+    latest_div = raw.dropna(subset=["Dividen 原始資料"]).groupby("Symbol")["Dividen 原始資料"].last()
+
+    inputs = pd.DataFrame(index=summary.index)
+    inputs["latest_dividen"] = latest_div.reindex(inputs.index).fillna(0.0)
+    inputs["eps_growth_mean"] = growth["mean"].reindex(inputs.index).fillna(0.0)
+    inputs["eps_growth_std"] = growth["std"].reindex(inputs.index).fillna(0.0).clip(lower=MIN_GROWTH_STD)
+    inputs["yield_std"] = (TARGET_DIVIDEND_YIELD * div_growth_std.reindex(inputs.index)) \
+        .clip(*YIELD_STD_RANGE).fillna(DEFAULT_YIELD_STD)
+    inputs["discount_rate"] = base_discount_rate(summary["Total Score"].to_numpy(dtype=float))
+    inputs["discount_std"] = (DISCOUNT_STD_PER_EPS_STD * inputs["eps_growth_std"]).clip(*DISCOUNT_STD_RANGE)
+    inputs["current_price"] = pd.to_numeric(summary["Current Price"], errors="coerce")
+    inputs["point_fair_price"] = pd.to_numeric(summary[FAIR_PRICE_COLUMN], errors="coerce")
+    return inputs
+
+
+# =================== Monte Carlo ===================
+def simulate_fair_prices(inputs: pd.DataFrame, n_sims: int = N_SIMULATIONS, percentiles=PERCENTILES,
+                         memory_budget_mb: float = MEMORY_BUDGET_MB, seed: int = 0) -> pd.DataFrame:
+    """
+    fair price = latest_dividen * (1 + g) / yield * (1 - discount)
+    g ~ N(EPS 平均成長率, EPS 成長率標準差)，和 HW3 一樣限制在 [0, 15%]
+    yield ~ N(5%, yield_std)，discount ~ N(HW3 折現率, discount_std)，兩個標準差都是每個 symbol 各自擬合
+    依記憶體預算把 (symbols x simulations) 切 chunk 計算。
+    每個 symbol 有自己的亂數序列 (SeedSequence.spawn)，所以結果不受 chunk 大小影響。
+    """
+    latest_div = inputs["latest_dividen"].to_numpy(dtype=np.float32)
+    g_mu = inputs["eps_growth_mean"].to_numpy(dtype=np.float32)
+    g_sigma = inputs["eps_growth_std"].to_numpy(dtype=np.float32)
+    y_sigma = inputs["yield_std"].to_numpy(dtype=np.float32)
+    disc_mu = inputs["discount_rate"].to_numpy(dtype=np.float32)
+    disc_sigma = inputs["discount_std"].to_numpy(dtype=np.float32)
+    current = inputs["current_price"].to_numpy(dtype=np.float32)
+
+    n_symbols = len(inputs)
+    symbol_seeds = np.random.SeedSequence(seed).spawn(n_symbols)
+    # 每個 chunk 同時存在 4 個 (rows x n_sims) 的 float32 陣列
+    bytes_per_row = n_sims * 4 * 4
+    chunk_rows = max(1, int(memory_budget_mb * 1024 * 1024 // bytes_per_row))
+
+    pct_out = np.full((n_symbols, len(percentiles)), np.nan, dtype=np.float64)
+    prob_out = np.full(n_symbols, np.nan, dtype=np.float64)
+
+    for start in range(0, n_symbols, chunk_rows):
+        sl = slice(start, min(start + chunk_rows, n_symbols))
+        rows = sl.stop - sl.start
+
+        fair = np.empty((rows, n_sims), dtype=np.float32)
+        z_yield = np.empty((rows, n_sims), dtype=np.float32)
+        z_disc = np.empty((rows, n_sims), dtype=np.float32)
+        for r in range(rows):
+            rng = np.random.default_rng(symbol_seeds[start + r])
+            rng.standard_normal(dtype=np.float32, out=fair[r])
+            rng.standard_normal(dtype=np.float32, out=z_yield[r])
+            rng.standard_normal(dtype=np.float32, out=z_disc[r])
+
+        fair *= g_sigma[sl, None]
+        fair += g_mu[sl, None]
+        np.clip(fair, 0.0, EPS_GROWTH_CAP, out=fair)
+        fair += 1.0
+        fair *= latest_div[sl, None]  # 預估下一年度股息
+
+        z_yield *= y_sigma[sl, None]
+        z_yield += TARGET_DIVIDEND_YIELD
+        np.maximum(z_yield, YIELD_FLOOR, out=z_yield)
+        fair /= z_yield
+
+        z_disc *= disc_sigma[sl, None]
+        z_disc += disc_mu[sl, None]
+        np.clip(z_disc, 0.0, 0.5, out=z_disc)
+        np.subtract(1.0, z_disc, out=z_disc)
+        fair *= z_disc
+
+        pct_out[sl] = np.percentile(fair, percentiles, axis=1).T
+        prob_out[sl] = (fair > current[sl, None]).mean(axis=1)
+
+    # 沒有股息的公司 HW3 也算不出 fair price
+    no_div = latest_div <= 0
+    pct_out[no_div] = np.nan
+    prob_out[no_div | np.isnan(current)] = np.nan
+
+    result = pd.DataFrame(pct_out, index=inputs.index, columns=[f"Fair Price P{p}" for p in percentiles])
+    result["Point Fair Price"] = inputs["point_fair_price"]
+    result["Current Price"] = inputs["current_price"]
+    result["P(Current < Fair)"] = prob_out
+    return result
+
+
+# =================== Benchmark ===================
+def benchmark(n_symbols: int = 3000, n_sims: int = N_SIMULATIONS):
+    rng = np.random.default_rng(42)
+    inputs = pd.DataFrame({
+        "latest_dividen": rng.uniform(0, 10, n_symbols),
+        "eps_growth_mean": rng.normal(0.05, 0.05, n_symbols),
+        "eps_growth_std": rng.uniform(MIN_GROWTH_STD, 0.3, n_symbols),
+        "yield_std": rng.uniform(*YIELD_STD_RANGE, n_symbols),
+        "discount_rate": rng.choice([0.08, 0.10, 0.12], n_symbols),
+        "discount_std": rng.uniform(*DISCOUNT_STD_RANGE, n_symbols),
+        "current_price": rng.uniform(10, 300, n_symbols),
+        "point_fair_price": np.nan,
+    }, index=[f"SYM{i}" for i in range(n_symbols)])
+
+    start = time.perf_counter()
+    simulate_fair_prices(inputs, n_sims=n_sims)
+    elapsed = time.perf_counter() - start
+
+    print("-" * 50)
+    print(f"{n_symbols} symbols x {n_sims} simulations: {elapsed:.2f}s")
+    print("-" * 50)
+    return elapsed
+
+
+# =================== 主程式 ===================
+if __name__ == "__main__":
+    summary_csv = input("Please input HW3 Report_Summary csv (或 bench): ").strip()
+
+    if summary_csv == "bench":
+        benchmark()
+    else:
+        raw_csv = summary_csv.replace("Report_Summary_", "Report_RawData_")
+        inputs = load_inputs(summary_csv, raw_csv)
+        result = simulate_fair_prices(inputs)
+
+        likely_undervalued = result.index[result["P(Current < Fair)"] > 0.5].tolist()
+        print("-" * 50)
+        print(result.round(2))
+        print(f"低於合理價格機率 > 50% 的公司: {likely_undervalued}")
+        print("-" * 50)
+
+        out_csv = summary_csv.replace("Report_Summary_", "Report_MonteCarlo_")
+        result.to_csv(out_csv, float_format='%.2f')
+        print(f"Monte Carlo 結果已儲存至: {out_csv}")
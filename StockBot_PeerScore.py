@@ -0,0 +1,155 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from StockBot_Snapshot import read_snapshot
+
+SECTOR_MAP_CSV = "sector_map.csv"  # Symbol,Sector 對照表
+UNKNOWN_SECTOR = "Unknown"
+MIN_GROUP_SIZE = 2  # 同產業只有 1 家 (或產業不明) 時，改跟整個 universe 比較
+
+# 原始數據欄位 -> 每家公司取「最差的一年」，對應 HW2/HW3 的「每年都 > 門檻」
+PEER_METRICS = {
+    "ROE": "ROE 原始資料",
+    "Net Margin": "Net Margin 原始資料",
+    "IC": "Interest Coverage 原始資料",
+}
+GROWTH_METRIC = "EPS Growth"  # EPS 平均成長率
+
+
+# =================== 產業分類 ===================
+def load_sector_map(symbols: list, path: str = SECTOR_MAP_CSV, snapshot: dict = None) -> pd.Series:
+    """
+    先查本地對照表，查不到的再用 snapshot (read_snapshot 的結果) 裡的 info['sector']，不逐家連網
+    兩者都沒有時 raise；仍查不到的 symbol 標成 UNKNOWN_SECTOR
+    """
+    snapshot = snapshot or {}
+    sectors = pd.Series(np.nan, index=pd.Index(symbols, name="Symbol"), dtype=object)
+    if os.path.exists(path):
+        mapping = pd.read_csv(path, index_col="Symbol")["Sector"]
+        sectors = mapping.reindex(sectors.index).astype(object)
+
+    infos = {symbol: snapshot.get(symbol, {}).get("info") for symbol in sectors.index[sectors.isna()]}
+    if not os.path.exists(path) and not any(infos.values()):
+        raise FileNotFoundError(f"找不到產業對照表 {path}，也沒有含 info 的 snapshot")
+    for symbol, info in infos.items():
+        if info:
+            sectors[symbol] = info.get("sector")
+
+    missing = sectors.index[sectors.isna()].tolist()
+    if missing:
+        print(f"沒有產業資料，改跟整個 universe 比較: {missing}")
+    return sectors.fillna(UNKNOWN_SECTOR)
+
+
+# =================== 指標整理 ===================
+def load_metrics(raw_csv: str) -> pd.DataFrame:
+    """把 HW2/HW3 的 RawData 報表整理成每家公司一列 (groupby，不逐家迴圈)"""
+    raw = pd.read_csv(raw_csv, index_col=0)
+    raw = raw.dropna(subset=["Symbol"])  # 去掉公司之間的空白行
+    raw.index = raw.index.astype(int)
+    raw = raw.rename_axis("Year").reset_index().sort_values(["Symbol", "Year"])
+
+    grouped = raw.groupby("Symbol")
+    metrics = grouped[list(PEER_METRICS.values())].min()
+    metrics.columns = list(PEER_METRICS)
+    raw["eps_growth"] = grouped["EPS 原始資料"].pct_change(fill_method=None)
+    metrics[GROWTH_METRIC] = raw.groupby("Symbol")["eps_growth"].mean()
+    return metrics
+
+
+# =================== 同業百分位排名 ===================
+def rank_position(values: pd.DataFrame, group_key=None) -> pd.DataFrame:
+    """
+    (rank - 1) / (n - 1): 群組內最差 = 0，最好 = 1，n 只算有數值的公司
+    rank(pct=True) 的 rank/n 會讓兩家一組的後段班拿到 0.5，所以不用
+    同一群組有效數值少於 2 個時為 NaN (沒有可比較的對象)
+    """
+    if group_key is None:
+        rank = values.rank()
+        n = values.count()
+    else:
+        grouped = values.groupby(group_key)
+        rank = grouped.rank()
+        n = grouped.transform("count")
+    return (rank - 1) / (n - 1).where(n >= 2)
+
+
+def peer_percentiles(metrics: pd.DataFrame, sectors: pd.Series) -> pd.DataFrame:
+    """
+    整個 universe 一次 groupby(sector) 算每個指標在同業中的位置 (0 = 最差, 1 = 最好)
+    同產業家數 < MIN_GROUP_SIZE 或產業不明時，改用全 universe 的位置
+    Peer Basis / Peer Group Size 標示實際用來排名的群組
+    """
+    cols = list(metrics.columns)
+    df = metrics.join(sectors.rename("Sector"))
+    group_pct = rank_position(df[cols], df["Sector"])
+    universe_pct = rank_position(df[cols])
+    group_size = df["Sector"].map(df["Sector"].value_counts())
+
+    # Unknown 不算一個產業，跟太小的產業一樣改用全 universe
+    by_sector = ((group_size >= MIN_GROUP_SIZE) & (df["Sector"] != UNKNOWN_SECTOR)).to_numpy()
+    pct = pd.DataFrame(np.where(by_sector[:, None], group_pct, universe_pct), index=df.index, columns=cols)
+    pct.insert(0, "Sector", df["Sector"])
+    pct.insert(1, "Peer Basis", np.where(by_sector, "Sector", "Universe"))
+    pct.insert(2, "Peer Group Size", np.where(by_sector, group_size, len(df)).astype(int))
+    return pct
+
+
+def relative_scores(pct: pd.DataFrame) -> pd.DataFrame:
+    """
+    每項指標: 位置 >= 0.75 (+1), >= 0.5 (+0.5)，跟絕對評分的 +1/+0.5 對應
+    小群組時: 2 家 -> 較好的 +1、較差的 0；3 家 -> 1 / 0.5 / 0；並列時取平均位置
+    沒有可比較對象 (NaN) 的指標不給分
+    """
+    cols = list(PEER_METRICS) + [GROWTH_METRIC]
+    values = pct[cols].to_numpy(dtype=float)
+    points = np.select([values >= 0.75, values >= 0.5], [1.0, 0.5], default=0.0)
+
+    scores = pd.DataFrame(points, index=pct.index, columns=[f"{c} Peer Score" for c in cols])
+    scores["Peer Score"] = scores.sum(axis=1)
+    mean_pct = np.nanmean(values, axis=1)
+    scores["Peer Grade"] = np.select([mean_pct >= 0.75, mean_pct >= 0.5], ["A", "B"], default="C")
+    return scores
+
+
+def score_peers(summary_csv: str, raw_csv: str, sector_map_csv: str = SECTOR_MAP_CSV,
+                snapshot_path: str = None) -> pd.DataFrame:
+    """絕對評分 (Total Score) 與同業相對評分並列；snapshot_path 可補對照表沒有的產業"""
+    snapshot = read_snapshot(snapshot_path) if snapshot_path else None  # 只讀 info，不切換成 replay 模式
+    summary = pd.read_csv(summary_csv, index_col=0)
+    metrics = load_metrics(raw_csv)
+    sectors = load_sector_map(metrics.index.tolist(), sector_map_csv, snapshot)
+
+    pct = peer_percentiles(metrics, sectors)
+    scores = relative_scores(pct)
+
+    pct_cols = {c: f"{c} Peer Pct" for c in list(PEER_METRICS) + [GROWTH_METRIC]}
+    result = pct.rename(columns=pct_cols).join(scores)
+    result.insert(3, "Total Score", summary["Total Score"].reindex(result.index))
+    return result
+
+
+# =================== 主程式 ===================
+if __name__ == "__main__":
+    summary_csv = input("Please input HW2/HW3 score csv (Report_Summary_*.csv 或 Report_*_score.csv): ").strip()
+    if "Report_Summary_" in summary_csv:
+        raw_csv = summary_csv.replace("Report_Summary_", "Report_RawData_")
+        out_csv = summary_csv.replace("Report_Summary_", "Report_PeerScore_")
+    else:
+        raw_csv = summary_csv.replace("_score.csv", "_raw.csv")
+        out_csv = summary_csv.replace("_score.csv", "_peer.csv")
+
+    snapshot_path = input("Please input Snapshot_*.pkl.gz 補產業資料 (沒有就按 Enter): ").strip()
+
+    result = score_peers(summary_csv, raw_csv, snapshot_path=snapshot_path or None)
+
+    print("-" * 50)
+    print(result[["Sector", "Peer Basis", "Total Score", "Peer Score", "Peer Grade"]])
+    for grade in ["A", "B", "C"]:
+        print(f"同業相對 {grade} 級: {result.index[result['Peer Grade'] == grade].tolist()}")
+    print("-" * 50)
+
+    result.to_csv(out_csv, float_format='%.2f')
+    print(f"同業相對評分已儲存至: {out_csv}")
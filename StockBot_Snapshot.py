@@ -0,0 +1,238 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import platform
+import sys
+import time
+
+# 資料來源模式
+MODE_LIVE = "live"  # 直接打 yfinance
+MODE_RECORD = "record"  # 打 yfinance，同時記錄用到的每一份資料
+MODE_REPLAY = "replay"  # 完全從 snapshot 讀取，不連網
+
+_mode = MODE_LIVE
+_snapshot = {}  # {symbol: {attribute: data, "method()": {call_key: data}}}
+
+# 各階段需要的 ticker 欄位 (方法呼叫以 "name()" 表示)
+STAGE_INPUTS = {
+    "hw2": {"financials", "balance_sheet", "cashflow", "dividends"},
+    "hw3": {"info", "financials", "balance_sheet", "cashflow", "dividends"},
+    "hw4": {"quarterly_financials", "quarterly_balance_sheet", "quarterly_cashflow", "dividends", "history()"},
+}
+
+
+def call_key(args: tuple, kwargs: dict) -> str:
+    return repr((args, sorted(kwargs.items())))
+
+
+# =================== Ticker 替身 ===================
+class RecordingTicker:
+    """包住 yf.Ticker，把讀過的 financials / dividends / history(...) 等等記到 snapshot"""
+
+    def __init__(self, symbol: str):
+        import yfinance as yf
+        self._symbol = symbol
+        self._ticker = yf.Ticker(symbol)
+        self._data = _snapshot.setdefault(symbol, {})
+
+    def __getattr__(self, name):
+        value = getattr(self._ticker, name)
+        if not callable(value):
+            self._data[name] = value
+            return value
+
+        def record_call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            # 不同參數分開存，ex: history(start=...) 與 history(period="max")
+            self._data.setdefault(f"{name}()", {})[call_key(args, kwargs)] = result
+            return result
+        return record_call
+
+
+class SnapshotTicker:
+    """從 snapshot 提供跟 yf.Ticker 相同的屬性，replay 時使用"""
+
+    def __init__(self, symbol: str):
+        self._symbol = symbol
+        self._data = _snapshot.get(symbol, {})
+
+    def _lookup(self, name):
+        if name not in self._data:
+            raise AttributeError(f"{self._symbol}.{name} 不在 snapshot 裡")
+        return self._data[name]
+
+    def __getattr__(self, name):
+        if f"{name}()" in self._data:
+            calls = self._data[f"{name}()"]
+
+            def replay_call(*args, **kwargs):
+                key = call_key(args, kwargs)
+                if key in calls:
+                    return calls[key]
+                if len(calls) == 1:
+                    # 只錄過一次呼叫時直接用它 (ex: HW4 的 history(start=今天往前6年) 每天參數都不同)
+                    return next(iter(calls.values()))
+                raise AttributeError(f"{self._symbol}.{name}{key} 不在 snapshot 裡")
+            return replay_call
+        return self._lookup(name)
+
+
+def get_ticker(symbol: str):
+    """取代 yf.Ticker(symbol)，依照目前模式回傳真的 Ticker 或替身"""
+    if _mode == MODE_REPLAY:
+        return SnapshotTicker(symbol)
+    if _mode == MODE_RECORD:
+        return RecordingTicker(symbol)
+    import yfinance as yf
+    return yf.Ticker(symbol)
+
+
+# =================== 錄製 / 存檔 ===================
+def start_recording():
+    global _mode, _snapshot
+    if _mode == MODE_REPLAY:
+        return  # replay 中不要覆蓋 snapshot
+    _mode = MODE_RECORD
+    _snapshot = {}
+
+
+def save_snapshot(name: str, script: str, outputs: list = None) -> str:
+    """
+    寫出 Snapshot_{name}.pkl.gz (壓縮的原始輸入) 與 Manifest_{name}.json (本次執行的紀錄)
+    回傳 manifest 路徑
+    """
+    if _mode != MODE_RECORD:
+        return None
+    snapshot_path = f"Snapshot_{name}.pkl.gz"
+    manifest_path = f"Manifest_{name}.json"
+
+    blob = gzip.compress(pickle.dumps(_snapshot, protocol=pickle.HIGHEST_PROTOCOL), compresslevel=6)
+    with open(snapshot_path, "wb") as f:
+        f.write(blob)
+
+    versions = {"python": platform.python_version()}
+    for module in ("pandas", "numpy", "yfinance"):
+        if module in sys.modules:
+            versions[module] = getattr(sys.modules[module], "__version__", "unknown")
+
+    manifest = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "script": os.path.basename(script),
+        "symbols": sorted(_snapshot),
+        "attributes": {symbol: sorted(data) for symbol, data in sorted(_snapshot.items())},
+        "snapshot": snapshot_path,
+        "snapshot_sha256": hashlib.sha256(blob).hexdigest(),
+        "snapshot_bytes": len(blob),
+        "outputs": outputs or [],
+        "versions": versions,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"輸入資料 snapshot 已儲存至: {snapshot_path} ({len(blob) / 1024:.1f} KB)")
+    return manifest_path
+
+
+# =================== Replay ===================
+def read_snapshot(path: str) -> dict:
+    """只讀取 snapshot 內容 ({symbol: {attribute: data}})，不會切換模式"""
+    if path.endswith(".json"):  # 也可以直接給 manifest
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        path = os.path.join(os.path.dirname(path), manifest["snapshot"])
+    with open(path, "rb") as f:
+        return pickle.loads(gzip.decompress(f.read()))
+
+
+def load_snapshot(path: str) -> float:
+    """切換到 replay 模式並載入 snapshot，回傳載入耗時 (秒)"""
+    global _mode, _snapshot
+    start = time.perf_counter()
+    _snapshot = read_snapshot(path)
+    elapsed = time.perf_counter() - start
+    _mode = MODE_REPLAY
+    return elapsed
+
+
+def snapshot_symbols() -> list:
+    return list(_snapshot)
+
+
+def covered_stages() -> list:
+    """snapshot 裡的資料足夠重跑哪些階段 (至少一個 symbol 具備該階段全部欄位)"""
+    return [stage for stage, needed in STAGE_INPUTS.items()
+            if any(needed <= set(data) for data in _snapshot.values())]
+
+
+def replay(path: str, stages: list = None) -> dict:
+    """
+    從 snapshot 重新跑 HW2 / HW3 評分與 HW4 季度資料集，不連網
+    stages 預設為 snapshot 涵蓋的階段；指定了 snapshot 沒有的階段會直接 raise
+    回傳 {"hw2": score DataFrame, "hw3": score DataFrame, "hw4": {symbol: DataFrame},
+          "failed": {stage: [symbol]}, "timings": 各階段耗時}
+    """
+    import pandas as pd
+    import StockBot_HW2
+    import StockBot_HW3_FairPrice
+    import HW4_raw
+
+    timings = {"load": load_snapshot(path)}
+    symbols = snapshot_symbols()
+    available = covered_stages()
+    if stages is None:
+        stages = available
+    missing = [stage for stage in stages if stage not in available]
+    if missing:
+        raise ValueError(f"snapshot 沒有 {missing} 需要的資料 (可重跑: {available})")
+
+    def run_hw2(symbol):
+        result = StockBot_HW2.score_stock(symbol)
+        return None if result is None else result[0]
+
+    def run_hw3(symbol):
+        return StockBot_HW3_FairPrice.score_stock(symbol)[0]
+
+    def run_hw4(symbol):
+        try:
+            return HW4_raw.build_quarterly_dataset(symbol, save_csv=False)
+        except Exception as e:
+            print(f"{symbol} 發生錯誤: {e}")
+            return None
+
+    runners = {"hw2": run_hw2, "hw3": run_hw3, "hw4": run_hw4}
+    results = {"hw2": None, "hw3": None, "hw4": {}, "failed": {}, "timings": timings}
+    for stage in stages:
+        start = time.perf_counter()
+        outputs, failed = {}, []
+        for symbol in symbols:
+            output = runners[stage](symbol)
+            if output is None:
+                failed.append(symbol)
+            else:
+                outputs[symbol] = output
+        timings[stage] = time.perf_counter() - start
+
+        if not outputs:
+            raise RuntimeError(f"{stage} replay 沒有任何 symbol 成功: {failed}")
+        results["failed"][stage] = failed
+        results[stage] = outputs if stage == "hw4" else pd.concat(outputs.values())
+    return results
+
+
+# =================== 主程式 ===================
+if __name__ == "__main__":
+    snapshot_path = input("Please input Snapshot_*.pkl.gz 或 Manifest_*.json: ").strip()
+    results = replay(snapshot_path)
+
+    print("-" * 50)
+    if results["hw3"] is not None:
+        print(results["hw3"])
+    for stage, failed in results["failed"].items():
+        if failed:
+            print(f"{stage} 失敗的 symbol: {failed}")
+    for stage, seconds in results["timings"].items():
+        print(f"{stage}: {seconds * 1000:.1f} ms")
+    print("-" * 50)